@@ -28,8 +28,12 @@ It also exposes a few important functions and objects:
 - VERSION: A tuple representing the version of MPFB
 - BUILD_INFO: Build information of MPFB. It defaults to "FROM_SOURCE" if not a build, otherwise it contains the build date
 - DEBUG: A boolean indicating whether debug mode is enabled. If DEBUG is True, some early initialization info is printed to the console
-- MPFB_CONTEXTUAL_INFORMATION: A dictionary containing contextual information of the addon, such as in which package it was loaded
+- MPFB_CONTEXTUAL_INFORMATION: A dictionary containing contextual information of the addon, such as in which package it was loaded,
+  and under the key "SERVICES" the same dictionary of service classes as SERVICES below
 - ClassManager: A singleton object that manages the registration and unregistering of classes such as panels and operators
+- SERVICES: A dictionary with all the service classes, keyed by class name
+
+ClassManager, SERVICES and MPFB_CONTEXTUAL_INFORMATION are resolved lazily the first time they are accessed.
 """
 
 fake_bl_info = {  # pylint: disable=C0103
@@ -81,14 +85,24 @@ def log_crash(atype, value, tb):
         _OLD_EXCEPTHOOK(atype, value, tb)
 
 
+# Preference values which have already been looked up. This is cleared whenever a preference is
+# changed in the preference panel, and when the addon is unregistered.
+_PREF_CACHE = dict()
+
+
+def _clear_pref_cache():
+    """Forget all cached preference values, so that they are read again on next access."""
+    _PREF_CACHE.clear()
+
+
 def get_preference(name):
     """
     Retrieve a preference value from the MPFB preference panel.
 
     This function looks up a preference value by its name from the MPFB add-on's preferences.
-    If the preference is found, its value is returned. If the preference is not found, an error
-    message is printed, and None is returned. If the add-on or its preferences are not properly
-    initialized, a ValueError is raised.
+    If the preference is found, its value is returned. Found values are cached until a preference
+    is changed. If the preference is not found, an error message is printed, and None is returned.
+    If the add-on or its preferences are not properly initialized, a ValueError is raised.
 
     Args:
         name (str): The name of the preference to retrieve.
@@ -102,6 +116,8 @@ def get_preference(name):
     global DEBUG  # pylint: disable=W0602
     if DEBUG:
         print("get_preference(\"" + name + "\")")
+    if name in _PREF_CACHE:
+        return _PREF_CACHE[name]
     if __package__ in bpy.context.preferences.addons:
         mpfb = bpy.context.preferences.addons[__package__]
         if hasattr(mpfb, "preferences"):
@@ -110,6 +126,7 @@ def get_preference(name):
                 value = getattr(prefs, name)
                 if DEBUG:
                     print("Found addon preference", (name, value))
+                _PREF_CACHE[name] = value
                 return value
             print("There were addon preferences, but key did not exist:", name)
             print("preferences", dir(prefs))
@@ -122,11 +139,69 @@ def get_preference(name):
     raise ValueError("I don't seem to exist")
 
 
-ClassManager = None
-
+# ClassManager, SERVICES and MPFB_CONTEXTUAL_INFORMATION are not defined here. They are resolved on first access
+# by the module level __getattr__() below, so that merely loading the package does not cascade into importing
+# all of MPFB's subsystems.
+#
 # To get around the limitation where the extension platform only allows us to use relative imports, we will populate a
 # structure with information about the root package, and references to some of the most important classes.
-MPFB_CONTEXTUAL_INFORMATION = None
+
+
+def _create_contextual_information():
+    info = dict()
+    info["__package__"] = str(__package__)
+    info["__package_short__"] = str(__package__).split(".")[-1]
+    info["__file__"] = str(__file__)
+    return info
+
+
+def __getattr__(name):
+    """Lazily resolve the heavier module level objects the first time they are requested (PEP 562)."""
+    global MPFB_CONTEXTUAL_INFORMATION  # pylint: disable=W0601
+    global ClassManager  # pylint: disable=W0601
+
+    if name == "MPFB_CONTEXTUAL_INFORMATION":
+        MPFB_CONTEXTUAL_INFORMATION = _create_contextual_information()
+        return MPFB_CONTEXTUAL_INFORMATION
+
+    if name == "ClassManager":
+        from ._classmanager import ClassManager as _ClassManager
+        ClassManager = _ClassManager
+        return ClassManager
+
+    if name == "SERVICES":
+        from .services import SERVICES
+        return SERVICES
+
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+def _check_makehuman_user_data():
+    """Ask a running MakeHuman where its user data is. This is run via a timer once blender has had time to
+    draw its UI, since it might involve waiting for a socket connection. In background mode it is run
+    directly from register()."""
+
+    from .services import SystemService
+
+    if SystemService.is_blender_version_at_least():
+        _LOG.debug("About to check if MakeHuman is online")
+
+        # Try to find out where the makehuman user data is at
+        from .services import LocationService, SocketService
+        if LocationService.is_mh_auto_user_data_enabled():
+            mh_user_dir = None
+            try:
+                mh_user_dir = SocketService.get_user_dir()
+                _LOG.info("Socket service says makeHuman user dir is at", mh_user_dir)
+                if mh_user_dir and os.path.exists(mh_user_dir):
+                    mh_user_data = os.path.join(mh_user_dir, "data")
+                    LocationService.update_mh_user_data_if_relevant(mh_user_data)
+            except ConnectionRefusedError as err:
+                _LOG.error("Could not read mh_user_dir. Maybe socket server is down? Error was:", err)
+                mh_user_dir = None
+
+    # Returning None means the timer will not be run again
+    return None
 
 
 def register():
@@ -138,11 +213,8 @@ def register():
 
     # To allow other code structures (primarily the unit test code) access to MPFB's logic without knowing
     # anything about the module structure, store info about the package and the location of the root py.
-    global MPFB_CONTEXTUAL_INFORMATION
-    MPFB_CONTEXTUAL_INFORMATION = dict()
-    MPFB_CONTEXTUAL_INFORMATION["__package__"] = str(__package__)
-    MPFB_CONTEXTUAL_INFORMATION["__package_short__"] = str(__package__).split(".")[-1]
-    MPFB_CONTEXTUAL_INFORMATION["__file__"] = str(__file__)
+    global MPFB_CONTEXTUAL_INFORMATION  # pylint: disable=W0601
+    MPFB_CONTEXTUAL_INFORMATION = _create_contextual_information()
 
     # Preferences will be needed before starting the rest of the addon
     from ._preferences import MpfbPreferences
@@ -167,13 +239,15 @@ def register():
     # contain blender classes.
 
     from ._classmanager import ClassManager as _ClassManager
-    global ClassManager
+    global ClassManager  # pylint: disable=W0601
     ClassManager = _ClassManager
 
     if not ClassManager.isinitialized():
         classmanager = ClassManager()  # pylint: disable=W0612
         _LOG.debug("classmanager", classmanager)
 
+    # The UI modules add their classes to the class manager when they are imported, so this
+    # import cannot be deferred without leaving the class manager empty.
     _LOG.debug("About to import mpfb.ui")
     from .ui import UI_DUMMY_VALUE  # pylint: disable=W0612
 
@@ -185,25 +259,15 @@ def register():
     _LOG.debug("About to request class registration")
     ClassManager.register_classes()
 
-    from .services import SystemService
-
-    if SystemService.is_blender_version_at_least():
-        _LOG.debug("About to check if MakeHuman is online")
-
-        # Try to find out where the makehuman user data is at
-        from .services import LocationService, SocketService
-        if LocationService.is_mh_auto_user_data_enabled():
-            mh_user_dir = None
-            try:
-                mh_user_dir = SocketService.get_user_dir()
-                _LOG.info("Socket service says makeHuman user dir is at", mh_user_dir)
-                if mh_user_dir and os.path.exists(mh_user_dir):
-                    mh_user_data = os.path.join(mh_user_dir, "data")
-                    LocationService.update_mh_user_data_if_relevant(mh_user_data)
-            except ConnectionRefusedError as err:
-                _LOG.error("Could not read mh_user_dir. Maybe socket server is down? Error was:", err)
-                mh_user_dir = None
+    # Talking to MakeHuman is not needed for blender to finish starting, so postpone it until
+    # after the UI has been drawn. Timers never run in background mode (blender -b), so there
+    # it has to be done right away.
+    if bpy.app.background:
+        _check_makehuman_user_data()
+    elif not bpy.app.timers.is_registered(_check_makehuman_user_data):
+        bpy.app.timers.register(_check_makehuman_user_data, first_interval=0.1)
 
+    # The services package has already been imported above (via LogService), so this costs nothing
     from .services import SERVICES
     MPFB_CONTEXTUAL_INFORMATION["SERVICES"] = SERVICES
 
@@ -227,9 +291,19 @@ def unregister():
 
     global _LOG  # pylint: disable=W0603,W0602
 
+    if bpy.app.timers.is_registered(_check_makehuman_user_data):
+        bpy.app.timers.unregister(_check_makehuman_user_data)
+
     _LOG.debug("About to unregister classes")
     global ClassManager  # pylint: disable=W0603,W0602
     ClassManager.unregister_classes()
 
+    # Only flush, do not close. Blender keeps the submodules (and thus the existing loggers) loaded when the addon
+    # is disabled or scripts are reloaded, so the log files need to remain usable when register() runs again.
+    from .services import LogService
+    LogService.flush_log_files()
+
+    _clear_pref_cache()
+
 
 __all__ = ["VERSION", "DEBUG", "BUILD_INFO", "ClassManager", "MPFB_CONTEXTUAL_INFORMATION"]
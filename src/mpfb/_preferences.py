@@ -3,11 +3,18 @@
 import bpy
 
 
+def update_preference(self, context):
+    from . import _clear_pref_cache
+    _clear_pref_cache()
+
+
 def update_second_root(self, context):
+    update_preference(self, context)
     from .services import LocationService
 
 
 def update_mh_data(self, context):
+    update_preference(self, context)
     from .services import LocationService
     LocationService.update_mh_data()
 
@@ -28,7 +35,8 @@ class MpfbPreferences(bpy.types.AddonPreferences):
     mpfb_user_data: bpy.props.StringProperty(
         name="Path to MPFB user data",
         description="If you want to store MPFB user data somewhere other than in the default location, you can enter the path to an existing directory here",
-        default=""
+        default="",
+        update=update_preference
     )
 
     mpfb_second_root: bpy.props.StringProperty(
@@ -48,19 +56,22 @@ class MpfbPreferences(bpy.types.AddonPreferences):
     mh_auto_user_data: bpy.props.BoolProperty(
         name="Autodiscover path to MakeHuman user data",
         description="If the path to the MakeHuman user data directory is not specified, then try to figure it out automatically. If the path is explicitly set, this setting will have no effect",
-        default=False
+        default=False,
+        update=update_preference
     )
 
     mpfb_excepthook: bpy.props.BoolProperty(
         name="Globally log all uncaught exceptions",
         description="In order to log unhandled exceptions, MPFB can override the global exception handler. This might cause problems when reloading and/or together with other modules. However, if you run into a crash and need a proper log, you can enable this temporarily",
-        default=False
+        default=False,
+        update=update_preference
     )
 
     mpfb_shelf_label: bpy.props.StringProperty(
         name="Shelf label",
         description="If you want to use a different name for the MPFB shelf tab, you can enter any non-empty string here",
-        default=""
+        default="",
+        update=update_preference
     )
 
     def draw(self, context):
@@ -1,40 +1,112 @@
 """Functionality for logging and profiling"""
 
-import os, bpy, time, pprint, inspect, json
+import os, bpy, time, pprint, inspect, json, atexit, bisect, concurrent.futures
 from .. import get_preference, DEBUG, MPFB_CONTEXTUAL_INFORMATION
 
 # There's a catch 22 where paths should be read from the location
-# service, but the location service is dependent on the log service
+# service, but the location service is dependent on the log service.
+#
+# The paths are not resolved when this module is imported. Instead they are
+# set up by _bootstrap() the first time the log service is actually used.
 
-_OVERRIDDEN_HOME = None
+_LOGDIR = None
+_COMBINED = None
+_CONFIG_DIR = None
+_CONFIG = None
 
-try:
-    _OVERRIDDEN_HOME = get_preference("mpfb_user_data")
-except:
-    print("Could not read preference mpfb_user_data")
+# Kept open for the lifetime of the log service, rather than reopening the file for every message
+_COMBINED_FH = None
+_BUFFER_SIZE = 8192
 
-_BPYHOME = bpy.utils.resource_path('USER')  # pylint: disable=E1111
-if _OVERRIDDEN_HOME is None or not _OVERRIDDEN_HOME:
-    _MPFBHOME = os.path.join(_BPYHOME, MPFB_CONTEXTUAL_INFORMATION["__package_short__"])
-else:
-    _MPFBHOME = _OVERRIDDEN_HOME
-
-_LOGDIR = os.path.abspath(os.path.join(_MPFBHOME, "logs"))
-_COMBINED = os.path.join(_LOGDIR, "combined.txt")
-_CONFIG_DIR = os.path.join(_MPFBHOME, "config")
-_CONFIG = os.path.join(_CONFIG_DIR, "log_levels.json")
-
-if DEBUG:
-    print("\nInitializing MPFB log service. Logs can be found in " + str(_LOGDIR) + "\n")
-
-if not os.path.exists(_LOGDIR):
-    os.makedirs(_LOGDIR, exist_ok=True)
-
-if not os.path.exists(_CONFIG_DIR):
-    os.makedirs(_CONFIG_DIR, exist_ok=True)
+# Single worker thread which performs explicit flushes and closes of the log files. The messages
+# themselves are written directly to the buffered handles, as that is cheap. Submitting every message
+# to the worker instead made logging about five times slower for the caller.
+_IO_POOL = None
 
 _JUSTIFICATION = 40
-_START = int(time.time() * 1000.0)
+_START = time.monotonic_ns() // 1_000_000
+
+
+def _run_io(function, *args):
+    """Run a file operation on the log I/O thread, or directly if that thread is not available."""
+    if _IO_POOL is not None:
+        try:
+            return _IO_POOL.submit(function, *args)
+        except RuntimeError:
+            # The pool has been shut down, for example when the interpreter is exiting
+            pass
+    function(*args)
+    return None
+
+
+def _ensure_io():
+    """Reopen the combined log and restart the I/O thread, if they have been closed by close_log_files()."""
+    global _COMBINED_FH, _IO_POOL  # pylint: disable=W0603
+    if _COMBINED_FH is None:
+        _COMBINED_FH = open(_COMBINED, "a", encoding="utf-8", buffering=_BUFFER_SIZE)  # pylint: disable=R1732
+    if _IO_POOL is None:
+        _IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="mpfb_log")
+
+
+def _rotate_log_file(path):
+    """Move a log file from an earlier session out of the way, so that it is kept as for example combined.prev.txt."""
+    if os.path.exists(path):
+        (base, extension) = os.path.splitext(path)
+        try:
+            os.replace(path, base + ".prev" + extension)
+        except OSError as err:
+            # For example if another process has the file open on windows. The file will then be truncated instead.
+            print("Could not rotate log file " + path + ": " + str(err))
+
+
+def _wait_for_io(future):
+    if future is not None:
+        future.result()
+
+
+def _report_io_error(file_handle, err):
+    # Flushing and closing run on the I/O thread, where nobody would otherwise see the exception
+    print("Could not write to log file " + str(getattr(file_handle, "name", file_handle)) + ": " + str(err))
+
+
+def _append_message(path, message):
+    # Fallback for when a log file could not be kept open
+    try:
+        with open(path, "a", encoding="utf-8") as log_file:
+            log_file.write(message + "\n")
+    except OSError as err:
+        _report_io_error(path, err)
+
+
+def _write_messages(log_file, log_path, short_message, combined_file, long_message, flush):
+    if log_file is None:
+        _append_message(log_path, short_message)
+    for (file_handle, message) in ((log_file, short_message), (combined_file, long_message)):
+        if file_handle is not None and not file_handle.closed:
+            try:
+                file_handle.write(message + "\n")
+                if flush:
+                    file_handle.flush()
+            except (OSError, ValueError) as err:
+                _report_io_error(file_handle, err)
+
+
+def _flush_files(*file_handles):
+    for file_handle in file_handles:
+        if file_handle is not None and not file_handle.closed:
+            try:
+                file_handle.flush()
+            except (OSError, ValueError) as err:
+                _report_io_error(file_handle, err)
+
+
+def _close_files(*file_handles):
+    for file_handle in file_handles:
+        if file_handle is not None and not file_handle.closed:
+            try:
+                file_handle.close()
+            except (OSError, ValueError) as err:
+                _report_io_error(file_handle, err)
 
 
 class Logger():
@@ -44,6 +116,10 @@ class Logger():
     filtering of messages so that only those of a certain severity or higher are logged. This is useful for
     debugging and monitoring the behavior of the application."""
 
+    # There are many loggers and their set of attributes is fixed, so skip the per instance __dict__
+    __slots__ = ("name", "level", "level_is_overridden", "path", "time_stamp", "_fh", "_open_failed", "_location",
+                 "_level_prefix")
+
     def __init__(self, name, level=5):
         """Construct a new log channel."""
         self.name = name
@@ -51,22 +127,54 @@ class Logger():
         self.level_is_overridden = False
         self.path = os.path.join(_LOGDIR, "separated." + name + ".txt")
         self.time_stamp = _START
-        with open(self.path, "w", encoding="utf-8") as log_file:
-            log_file.write("")
+        # These never change for a channel, so there is no need to rebuild them for every message
+        self._location = (self.name + " ").ljust(_JUSTIFICATION, ".") + ": "
+        self._level_prefix = ["[" + level_name + "] " for level_name in LogService.LOGLEVELS]
+        # The log from an earlier session is kept as a .prev file. There are hundreds of channels and most
+        # of them never write anything, so this session's file is only opened when the first message
+        # gets past the level filter.
+        _rotate_log_file(self.path)
+        self._fh = None
+        self._open_failed = False
+
+    def _get_log_file(self):
+        """Return the open handle to this channel's log file, opening it if needed. Return None if it
+        could not be opened, in which case messages are appended by opening the file each time."""
+        if self._fh is None and not self._open_failed:
+            try:
+                self._fh = open(self.path, "a", encoding="utf-8", buffering=_BUFFER_SIZE)  # pylint: disable=R1732
+            except OSError as err:
+                # For example when the process has run out of file handles
+                print("Could not keep log file " + self.path + " open, will reopen it for each message: " + str(err))
+                self._open_failed = True
+        return self._fh
 
     def _log_message(self, level, message, extra_object=None):
-        if level <= self.level:
-            extra = ""
-            if not extra_object is None:
-                extra = " " + str(extra_object)
-            location = str(self.name + " ").ljust(_JUSTIFICATION, ".") + ": "
-            long_message = "[" + LogService.LOGLEVELS[level] + "] " + location + message + extra
-            short_message = "[" + LogService.LOGLEVELS[level] + "] " + message + extra
-            print(long_message)
-            with open(self.path, "a", encoding="utf-8") as log_file:
-                log_file.write(short_message + "\n")
-            with open(_COMBINED, "a", encoding="utf-8") as log_file:
-                log_file.write(long_message + "\n")
+        if level > self.level:
+            return
+        extra = ""
+        if not extra_object is None:
+            extra = " " + str(extra_object)
+        prefix = self._level_prefix[level]
+        long_message = f"{prefix}{self._location}{message}{extra}"
+        short_message = f"{prefix}{message}{extra}"
+        print(long_message)
+        if _COMBINED_FH is None or _IO_POOL is None:
+            # The log files have been closed by close_log_files(), but the logger is still in use
+            _ensure_io()
+        # Errors are flushed before returning, to make sure they end up on disk even if blender is about to go down
+        _write_messages(self._get_log_file(), self.path, short_message, _COMBINED_FH, long_message,
+                        level <= LogService.ERROR)
+
+    def flush(self):
+        """Write any pending messages for this channel and the combined log to disk, and wait for it to finish."""
+        _wait_for_io(_run_io(_flush_files, self._fh, _COMBINED_FH))
+
+    def close(self):
+        """Close the log file for this channel. If something is logged after this, the file is opened again for appending."""
+        if self._fh is not None:
+            _wait_for_io(_run_io(_close_files, self._fh))
+            self._fh = None
 
     def debug_enabled(self):
         """Check if debug logging is enabled for this logger."""
@@ -99,60 +207,75 @@ class Logger():
 
     def debug(self, message, extra_object=None):
         """Report a debug message, if the log level is at least 4."""
+        if self.level < LogService.DEBUG:
+            return
         self._log_message(LogService.DEBUG, message, extra_object)
 
     def trace(self, message, extra_object=None):
         """Report an trace message, if the log level is at least 5."""
+        if self.level < LogService.TRACE:
+            return
         self._log_message(LogService.TRACE, message, extra_object)
 
     def dump(self, message, extra_object):
-        """Dump a large data structure to the log, if the log level is at least trace."""
-        if self.level > LogService.TRACE:
-            if isinstance(extra_object, str):
-                serialized_object = "\n" + extra_object
-            else:
-                serialized_object = "\n" + pprint.pformat(extra_object, 4, 180, depth=5)
-            self._log_message(LogService.DUMP, message, serialized_object)
+        """Dump a large data structure to the log, if the log level is at least 6 (dump).
+
+        Note that this is one level above trace. The level is checked before the object is
+        serialized, so dumping costs next to nothing when the channel is not set to dump."""
+        if self.level < LogService.DUMP:
+            return
+        if isinstance(extra_object, str):
+            serialized_object = "\n" + extra_object
+        else:
+            serialized_object = "\n" + pprint.pformat(extra_object, 4, 180, depth=5)
+        self._log_message(LogService.DUMP, message, serialized_object)
 
     def enter(self):
         """Report that a method was entered, if the log level is at least trace."""
         if self.level >= LogService.TRACE:
-            info = dict()
-            stack = inspect.currentframe().f_back
-            info["line_number"] = str(stack.f_lineno)
-            info["caller_name"] = stack.f_globals["__name__"]
-            info["file_name"] = stack.f_globals["__file__"]
-            info["caller_method"] = inspect.stack()[1][3]
+            frame = inspect.currentframe().f_back
+            info = {
+                "line_number": str(frame.f_lineno),
+                "caller_name": frame.f_globals.get("__name__", ""),
+                "file_name": frame.f_globals.get("__file__", ""),
+                "caller_method": frame.f_code.co_name
+            }
             message = "Now entering {}.{}():{}".format(info["caller_name"], info["caller_method"], info["line_number"])
             self._log_message(LogService.TRACE, message)
 
     def leave(self):
         """Report that a method is about to be exited, if the log level is at least trace."""
         if self.level >= LogService.TRACE:
-            info = dict()
-            stack = inspect.currentframe().f_back
-            info["line_number"] = str(stack.f_lineno)
-            info["caller_name"] = stack.f_globals["__name__"]
-            info["file_name"] = stack.f_globals["__file__"]
-            info["caller_method"] = inspect.stack()[1][3]
+            frame = inspect.currentframe().f_back
+            info = {
+                "line_number": str(frame.f_lineno),
+                "caller_name": frame.f_globals.get("__name__", ""),
+                "file_name": frame.f_globals.get("__file__", ""),
+                "caller_method": frame.f_code.co_name
+            }
             message = "Now leaving {}.{}():{}".format(info["caller_name"], info["caller_method"], info["line_number"])
             self._log_message(LogService.TRACE, message)
 
     def get_current_time(self):
         """Return the number of millisections which has passed since time was last reset for this channel."""
-        return int(time.time() * 1000.0) - self.time_stamp
+        return time.monotonic_ns() // 1_000_000 - self.time_stamp
 
     def time(self, message):
         """Report a timestamp message, if log level is at least debug."""
-        current = int(time.time() * 1000.0)
+        current = time.monotonic_ns() // 1_000_000
         self._log_message(LogService.DEBUG, message, current - self.time_stamp)
 
     def reset_timer(self):
         """Reset the timer for this log channel"""
-        self.time_stamp = int(time.time() * 1000.0)
+        self.time_stamp = time.monotonic_ns() // 1_000_000
 
     def get_path_to_log_file(self):
         """Return the absolute path to the log file for this logger."""
+        self.flush()
+        if not os.path.exists(self.path):
+            # Nothing has been logged to this channel yet, but callers expect the file to exist
+            with open(self.path, "a", encoding="utf-8"):
+                pass
         return os.path.abspath(self.path)
 
 
@@ -175,46 +298,59 @@ class LogService():
     @staticmethod
     def get_logger(name):
         """Get (or create) a log channel with the specified name."""
-        return _LOGSERVICE.get_or_create_log_channel(str(name))
+        return _get_service().get_or_create_log_channel(str(name))
 
     @staticmethod
     def set_default_log_level(level):
         """Set the default level to use for channels, if no specific override has been set for that channel."""
-        return _LOGSERVICE.set_default_log_level(level)
+        return _get_service().set_default_log_level(level)
 
     @staticmethod
     def get_default_log_level():
         """Return the default log level."""
-        return _LOGSERVICE.get_default_log_level()
+        return _get_service().get_default_log_level()
 
     @staticmethod
     def get_loggers_list_as_property_enum(log_filter=""):
         """Return a list of loggers in a format which is appropriate for lists in the UI."""
-        return _LOGSERVICE.get_loggers_list_as_property_enum(log_filter)
+        return _get_service().get_loggers_list_as_property_enum(log_filter)
 
     @staticmethod
     def get_loggers_categories_as_property_enum():
         """Return a list of logger categories in a format which is appropriate for lists in the UI."""
-        return _LOGSERVICE.get_loggers_categories_as_property_enum()
+        return _get_service().get_loggers_categories_as_property_enum()
 
     @staticmethod
     def get_loggers():
         """Return a live dict with the currently defined loggers."""
-        return _LOGSERVICE.get_loggers()
+        return _get_service().get_loggers()
 
     @staticmethod
     def set_level_override(logger_name, level):
         """Specify a different level to use rather than the default for the specified logger."""
-        _LOGSERVICE.set_level_override(logger_name, level)
+        _get_service().set_level_override(logger_name, level)
 
     @staticmethod
     def reset_log_levels():
         """Reset all levels (including the default) to the factory settings."""
-        _LOGSERVICE.reset_log_levels()
+        _get_service().reset_log_levels()
+
+    @staticmethod
+    def flush_log_files():
+        """Write all buffered log messages and pending log config changes to disk."""
+        if _LOGSERVICE_INSTANCE is not None:
+            _LOGSERVICE_INSTANCE.flush_log_files()
+
+    @staticmethod
+    def close_log_files():
+        """Flush and close all log files. Files are opened again if anything is logged afterwards."""
+        if _LOGSERVICE_INSTANCE is not None:
+            _LOGSERVICE_INSTANCE.close_log_files()
 
     @staticmethod
     def get_path_to_combined_log_file():
         """Return the absolute path to the combined log file."""
+        _get_service().flush_log_files()
         return os.path.abspath(_COMBINED)
 
 
@@ -222,6 +358,11 @@ class _LogService():
 
     def __init__(self):
         self._loggers = dict()
+        # Logger names kept in sorted order as they are created, so the UI enums do not need to sort them
+        self._sorted_names = []
+        # Enum lists already produced for the UI, keyed by filter. Cleared whenever a logger is added.
+        self._enum_cache = dict()
+        self._dirty = False
         self._default_log_level = LogService.INFO
         self._level_overrides = dict()
         self._level_overrides["default"] = self._default_log_level
@@ -233,8 +374,10 @@ class _LogService():
         else:
             print("Log config does not exist. Creating empty template.")
             self.rewrite_json()
-        with open(_COMBINED, "w", encoding="utf-8") as log_file:
-            log_file.write("")
+        global _COMBINED_FH, _IO_POOL  # pylint: disable=W0603
+        _rotate_log_file(_COMBINED)
+        _COMBINED_FH = open(_COMBINED, "w", encoding="utf-8", buffering=_BUFFER_SIZE)  # pylint: disable=R1732
+        _IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="mpfb_log")
 
     def get_default_log_level(self):
         """Return the default log level."""
@@ -255,14 +398,29 @@ class _LogService():
             logger.level_is_overridden = False
 
     def rewrite_json(self):
-        """Rewrite the log configuration file with the current level overrides.
+        """Schedule a rewrite of the log configuration file with the current level overrides.
+
+        The actual write is done by flush_json() via a short timer, so that a burst of changes (for
+        example when dragging a slider in the UI) only results in the file being written once.
+        """
+        self._dirty = True
+        if not bpy.app.timers.is_registered(_flush_log_config):
+            bpy.app.timers.register(_flush_log_config, first_interval=0.5)
+
+    def flush_json(self):
+        """Write the log configuration file, if there are changes which have not yet been written.
 
         This method updates the log configuration file (_CONFIG) with the current state of the
         level overrides (_level_overrides) in JSON format.
         """
+        if not self._dirty:
+            return
+        self._dirty = False
         print("Will rewrite log config " + _CONFIG)
+        # Serialize to a string first, so the file is written in one go rather than piecewise by json.dump()
+        serialized = json.dumps(self._level_overrides, separators=(",", ":"))
         with open(_CONFIG, "w", encoding="utf-8") as json_file:
-            json.dump(self._level_overrides, json_file)
+            json_file.write(serialized)
 
     def get_or_create_log_channel(self, name):
         """Get an existing log channel or create a new one if it doesn't exist.
@@ -279,6 +437,8 @@ class _LogService():
         """
         if name not in self._loggers:
             self._loggers[name] = Logger(name, self._default_log_level)
+            bisect.insort(self._sorted_names, name)
+            self._enum_cache.clear()
             if name in self._level_overrides:
                 self._loggers[name].set_level(self._level_overrides[name])
         return self._loggers[name]
@@ -310,6 +470,8 @@ class _LogService():
             logger_name (str): The name of the log channel.
             level (int): The log level to set for the specified log channel.
         """
+        if self._level_overrides.get(logger_name) == level:
+            return
         logger = self.get_or_create_log_channel(logger_name)
         self._level_overrides[logger_name] = level
         logger.set_level(level)
@@ -330,14 +492,16 @@ class _LogService():
         """
         if log_filter == "ALL":
             log_filter = ""
+        cache_key = ("loggers", log_filter)
+        if cache_key in self._enum_cache:
+            return self._enum_cache[cache_key]
         loggers = [("default", "default", "the default log level", 0)]
         current = 1
-        logger_names = list(self._loggers.keys())
-        logger_names.sort()
-        for name in logger_names:
+        for name in self._sorted_names:
             if not log_filter or name.startswith(log_filter):
                 loggers.append((name, name, name, current))
                 current = current + 1
+        self._enum_cache[cache_key] = loggers
         return loggers
 
     def get_loggers_categories_as_property_enum(self):
@@ -350,20 +514,20 @@ class _LogService():
         Returns:
             list: A list of tuples representing logger categories for UI property enums.
         """
+        cache_key = ("categories", None)
+        if cache_key in self._enum_cache:
+            return self._enum_cache[cache_key]
         categories = [("ALL", "(no filter)", "Do not filter: show all loggers", 0)]
         current = 1
-        logger_names = list(self._loggers.keys())
-        logger_names.sort()
-        category_names = []
-        for name in logger_names:
-            if not "." in name:
-                cat = name
-            else:
-                (cat, suffix) = str(name).split(".", 1)
-            if not cat in category_names:
-                category_names.append(cat)
-                categories.append((cat, cat, cat, current))
-                current = current + 1
+        category_names = set()
+        for name in self._sorted_names:
+            cat = name.partition(".")[0]
+            if cat in category_names:
+                continue
+            category_names.add(cat)
+            categories.append((cat, cat, cat, current))
+            current = current + 1
+        self._enum_cache[cache_key] = categories
         return categories
 
     def get_loggers(self):
@@ -378,5 +542,81 @@ class _LogService():
         """
         return self._loggers
 
+    def flush_log_files(self):
+        """Write pending messages of all log channels and of the combined log, and pending config changes, to disk."""
+        for logger in self._loggers.values():
+            logger.flush()
+        self.flush_json()
+
+    def close_log_files(self):
+        """Flush and close the log files of all log channels and the combined log, and stop the I/O thread."""
+        global _COMBINED_FH, _IO_POOL  # pylint: disable=W0603
+        if bpy.app.timers.is_registered(_flush_log_config):
+            bpy.app.timers.unregister(_flush_log_config)
+        self.flush_json()
+        for logger in self._loggers.values():
+            logger.close()
+        if _COMBINED_FH is not None:
+            _wait_for_io(_run_io(_close_files, _COMBINED_FH))
+            _COMBINED_FH = None
+        if _IO_POOL is not None:
+            _IO_POOL.shutdown(wait=True)
+            _IO_POOL = None
+
+
+_LOGSERVICE_INSTANCE = None
+
+
+def _flush_log_config():
+    """Timer callback for writing pending changes to the log configuration file."""
+    if _LOGSERVICE_INSTANCE is not None:
+        _LOGSERVICE_INSTANCE.flush_json()
+    # Returning None means the timer will not be run again
+    return None
+
+
+def _bootstrap():
+    """Resolve the log and config paths and make sure the directories exist."""
+    global _LOGDIR, _COMBINED, _CONFIG_DIR, _CONFIG  # pylint: disable=W0603
+
+    overridden_home = None
+
+    try:
+        overridden_home = get_preference("mpfb_user_data")
+    except:
+        print("Could not read preference mpfb_user_data")
+
+    if overridden_home is None or not overridden_home:
+        bpy_home = bpy.utils.resource_path('USER')  # pylint: disable=E1111
+        mpfb_home = os.path.join(bpy_home, MPFB_CONTEXTUAL_INFORMATION["__package_short__"])
+    else:
+        mpfb_home = overridden_home
+
+    _LOGDIR = os.path.abspath(os.path.join(mpfb_home, "logs"))
+    _COMBINED = os.path.join(_LOGDIR, "combined.txt")
+    _CONFIG_DIR = os.path.join(mpfb_home, "config")
+    _CONFIG = os.path.join(_CONFIG_DIR, "log_levels.json")
+
+    if DEBUG:
+        print("\nInitializing MPFB log service. Logs can be found in " + str(_LOGDIR) + "\n")
+
+    os.makedirs(_LOGDIR, exist_ok=True)
+    os.makedirs(_CONFIG_DIR, exist_ok=True)
+
+
+def _get_service():
+    """Return the log service singleton, creating it on first use."""
+    global _LOGSERVICE_INSTANCE  # pylint: disable=W0603
+    if _LOGSERVICE_INSTANCE is None:
+        _bootstrap()
+        _LOGSERVICE_INSTANCE = _LogService()
+        # This also writes pending log config changes
+        atexit.register(LogService.flush_log_files)
+    return _LOGSERVICE_INSTANCE
+
 
-_LOGSERVICE = _LogService()
+def __getattr__(name):
+    # Kept for backwards compatibility with code expecting a module level _LOGSERVICE
+    if name == "_LOGSERVICE":
+        return _get_service()
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
@@ -218,37 +218,27 @@ class MPFB_OT_Write_Composite_Operator(bpy.types.Operator):
             pyfile.write("import bpy, os\n")
             pyfile.write("from pytest import approx\n")
             pyfile.write("from .. import dynamic_import\n")
-            pyfile.write("from .. import ObjectService\n")
-            pyfile.write("from .. import NodeService\n")
             pyfile.write(f"NodeWrapper{output_name} = dynamic_import(\"mpfb.entities.nodemodel.v2.composites.nodewrapper{output_name.lower()}\", \"NodeWrapper{output_name}\")\n")
             # pyfile.write("from ....services import ObjectService\n")
             # pyfile.write("from ....services import NodeService\n")
             # pyfile.write("from mpfb.entities.nodemodel.v2.composites.nodewrapper" + output_name.lower() + " import NodeWrapper" + output_name + "\n\n")
             pyfile.write("def test_composite_is_available():\n")
             pyfile.write("    assert NodeWrapper" + output_name + "\n\n")
-            pyfile.write("def test_composite_can_create_instance():\n")
-            pyfile.write("    node_tree_name = ObjectService.random_name()\n")
-            pyfile.write("    node_tree = NodeService.create_node_tree(node_tree_name)\n")
+            # The node_tree fixture is defined in test/tests/ddd_entities/conftest.py
+            pyfile.write("def test_composite_can_create_instance(node_tree):\n")
             pyfile.write("    node = NodeWrapper" + output_name + ".create_instance(node_tree)\n")
             pyfile.write("    assert node\n")
             pyfile.write("    assert node.node_tree.name == \"" + output_name + "\"\n")
             for node in tree_def["nodes"]:
                 pyfile.write("    assert \"" + node["name"] + "\" in node.node_tree.nodes\n")
-            pyfile.write("    has_link_to_output = False\n")
-            pyfile.write("    for link in node.node_tree.links:\n")
-            pyfile.write("        if link.to_node.name == \"Group Output\":\n")
-            pyfile.write("            has_link_to_output = True\n")
+            pyfile.write("    has_link_to_output = any(socket.is_linked for socket in node.node_tree.nodes[\"Group Output\"].inputs)\n")
             pyfile.write("    assert has_link_to_output\n")
-            pyfile.write("    node_tree.nodes.remove(node)\n")
-            pyfile.write("    NodeService.destroy_node_tree(node_tree)\n\n")
+            pyfile.write("    node_tree.nodes.remove(node)\n\n")
 
-            pyfile.write("def test_composite_validate_tree():\n")
-            pyfile.write("    node_tree_name = ObjectService.random_name()\n")
-            pyfile.write("    node_tree = NodeService.create_node_tree(node_tree_name)\n")
+            pyfile.write("def test_composite_validate_tree(node_tree):\n")
             pyfile.write("    node = NodeWrapper" + output_name + ".create_instance(node_tree)\n")
             pyfile.write("    assert NodeWrapper" + output_name + ".validate_tree_against_original_def()\n")
             pyfile.write("    node_tree.nodes.remove(node)\n")
-            pyfile.write("    NodeService.destroy_node_tree(node_tree)\n")
 
         return {'FINISHED'}
 
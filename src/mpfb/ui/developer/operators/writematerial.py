@@ -175,10 +175,7 @@ class MPFB_OT_Write_Material_Operator(bpy.types.Operator):
                 for node in tree_def["nodes"]:
                     pyfile.write("    assert \"" + node["name"] + "\" in node_tree.nodes\n")
 
-            pyfile.write("    has_link_to_output = False\n")
-            pyfile.write("    for link in node_tree.links:\n")
-            pyfile.write("        if link.to_node.name == \"Material Output\":\n")
-            pyfile.write("            has_link_to_output = True\n")
+            pyfile.write("    has_link_to_output = any(socket.is_linked for socket in node_tree.nodes[\"Material Output\"].inputs)\n")
             pyfile.write("    assert has_link_to_output\n")
             pyfile.write("    NodeService.destroy_node_tree(node_tree)\n\n")
 
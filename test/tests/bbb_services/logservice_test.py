@@ -0,0 +1,167 @@
+import bpy, os, json
+from .. import dynamic_import
+from .. import LogService
+from .. import ObjectService
+
+Logger = dynamic_import("mpfb.services.logservice", "Logger")
+_flush_log_config = dynamic_import("mpfb.services.logservice", "_flush_log_config")
+
+
+def _service():
+    return dynamic_import("mpfb.services.logservice", "_LOGSERVICE")
+
+
+def _config_path():
+    _service()
+    return dynamic_import("mpfb.services.logservice", "_CONFIG")
+
+
+def _logger_name():
+    return "test.logservice." + ObjectService.random_name()
+
+
+def _remove_files(path):
+    previous_path = os.path.splitext(path)[0] + ".prev.txt"
+    for file_path in (path, previous_path):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def _discard_logger(name):
+    """Remove a channel created by a test again, including its override and log files,
+    so that it does not linger in the user's log dir or in the developer panel."""
+    service = _service()
+    if name in service._level_overrides:
+        del service._level_overrides[name]
+        service.rewrite_json()
+        service.flush_json()
+    logger = service.get_loggers().pop(name, None)
+    if name in service._sorted_names:
+        service._sorted_names.remove(name)
+    service._enum_cache.clear()
+    if logger is not None:
+        logger.close()
+        _remove_files(logger.path)
+
+
+def test_logservice_exists():
+    """LogService"""
+    assert LogService is not None, "LogService can be imported"
+
+
+def test_flush_json_writes_compact_json():
+    """flush_json"""
+    name = _logger_name()
+    service = _service()
+    try:
+        LogService.set_level_override(name, LogService.DEBUG)
+        service.flush_json()
+        with open(_config_path(), "r", encoding="utf-8") as json_file:
+            content = json_file.read()
+        assert content == json.dumps(service._level_overrides, separators=(",", ":"))
+        assert json.loads(content)[name] == LogService.DEBUG
+    finally:
+        _discard_logger(name)
+
+
+def test_repeated_level_override_does_not_schedule_write():
+    """set_level_override"""
+    name = _logger_name()
+    service = _service()
+    try:
+        LogService.set_level_override(name, LogService.DEBUG)
+        service.flush_json()
+        if bpy.app.timers.is_registered(_flush_log_config):
+            bpy.app.timers.unregister(_flush_log_config)
+        LogService.set_level_override(name, LogService.DEBUG)
+        assert not bpy.app.timers.is_registered(_flush_log_config)
+    finally:
+        _discard_logger(name)
+
+
+def test_log_file_is_only_created_when_needed():
+    """Logger opens its file lazily"""
+    name = _logger_name()
+    try:
+        logger = LogService.get_logger(name)
+        logger.set_level(LogService.INFO)
+        logger.debug("This is below the level filter")
+        assert not os.path.exists(logger.path)
+        logger.info("This is not")
+        assert os.path.exists(logger.path)
+    finally:
+        _discard_logger(name)
+
+
+def test_log_file_contains_logged_line():
+    """get_path_to_log_file"""
+    name = _logger_name()
+    try:
+        logger = LogService.get_logger(name)
+        logger.set_level(LogService.INFO)
+        message = "Message to find in the log file " + ObjectService.random_name()
+        logger.info(message)
+        with open(logger.get_path_to_log_file(), "r", encoding="utf-8") as log_file:
+            assert message in log_file.read()
+        with open(LogService.get_path_to_combined_log_file(), "r", encoding="utf-8") as log_file:
+            assert message in log_file.read()
+    finally:
+        _discard_logger(name)
+
+
+def test_logging_after_close_reopens_file():
+    """Logger.close"""
+    name = _logger_name()
+    try:
+        logger = LogService.get_logger(name)
+        logger.set_level(LogService.INFO)
+        logger.info("Message logged before close")
+        logger.close()
+        logger.info("Message logged after close")
+        with open(logger.get_path_to_log_file(), "r", encoding="utf-8") as log_file:
+            content = log_file.read()
+        assert "Message logged before close" in content
+        assert "Message logged after close" in content
+    finally:
+        _discard_logger(name)
+
+
+def test_new_logger_shows_up_in_cached_enums():
+    """get_loggers_list_as_property_enum"""
+    name = _logger_name()
+    try:
+        LogService.get_loggers_list_as_property_enum()
+        LogService.get_loggers_list_as_property_enum("test.logservice")
+        LogService.get_loggers_categories_as_property_enum()
+        LogService.get_logger(name)
+        names = [item[0] for item in LogService.get_loggers_list_as_property_enum()]
+        assert name in names
+        assert names[1:] == sorted(names[1:])
+        filtered = [item[0] for item in LogService.get_loggers_list_as_property_enum("test.logservice")]
+        assert name in filtered
+        assert all(item == "default" or item.startswith("test.logservice") for item in filtered)
+        categories = [item[0] for item in LogService.get_loggers_categories_as_property_enum()]
+        assert "test" in categories
+    finally:
+        _discard_logger(name)
+    assert name not in [item[0] for item in LogService.get_loggers_list_as_property_enum()]
+
+
+def test_previous_log_file_is_kept():
+    """Logger rotates the log file from an earlier session"""
+    _service()
+    name = _logger_name()
+    logger = None
+    try:
+        logger = Logger(name, LogService.INFO)
+        logger.info("Message from the earlier session")
+        logger.close()
+        logger = Logger(name, LogService.INFO)
+        previous_path = os.path.splitext(logger.path)[0] + ".prev.txt"
+        assert not os.path.exists(logger.path)
+        with open(previous_path, "r", encoding="utf-8") as log_file:
+            assert "Message from the earlier session" in log_file.read()
+    finally:
+        if logger is not None:
+            logger.close()
+            _remove_files(logger.path)
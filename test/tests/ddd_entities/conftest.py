@@ -0,0 +1,11 @@
+import pytest
+from .. import ObjectService
+from .. import NodeService
+
+
+@pytest.fixture(scope="module")
+def node_tree():
+    """A node tree which is shared by all tests in a module, and destroyed when the module is done."""
+    tree = NodeService.create_node_tree(ObjectService.random_name())
+    yield tree
+    NodeService.destroy_node_tree(tree)
@@ -1,16 +1,12 @@
 import bpy, os
 from pytest import approx
 from .. import dynamic_import
-from .. import ObjectService
-from .. import NodeService
 NodeWrapperMpfbAdditiveRange3 = dynamic_import("mpfb.entities.nodemodel.v2.composites.nodewrappermpfbadditiverange3", "NodeWrapperMpfbAdditiveRange3")
 
 def test_composite_is_available():
     assert NodeWrapperMpfbAdditiveRange3
 
-def test_composite_can_create_instance():
-    node_tree_name = ObjectService.random_name()
-    node_tree = NodeService.create_node_tree(node_tree_name)
+def test_composite_can_create_instance(node_tree):
     node = NodeWrapperMpfbAdditiveRange3.create_instance(node_tree)
     assert node
     assert node.node_tree.name == "MpfbAdditiveRange3"
@@ -35,18 +31,11 @@ def test_composite_can_create_instance():
     assert "Math.007" in node.node_tree.nodes
     assert "Group Output" in node.node_tree.nodes
     assert "Group Input" in node.node_tree.nodes
-    has_link_to_output = False
-    for link in node.node_tree.links:
-        if link.to_node.name == "Group Output":
-            has_link_to_output = True
+    has_link_to_output = any(socket.is_linked for socket in node.node_tree.nodes["Group Output"].inputs)
     assert has_link_to_output
     node_tree.nodes.remove(node)
-    NodeService.destroy_node_tree(node_tree)
 
-def test_composite_validate_tree():
-    node_tree_name = ObjectService.random_name()
-    node_tree = NodeService.create_node_tree(node_tree_name)
+def test_composite_validate_tree(node_tree):
     node = NodeWrapperMpfbAdditiveRange3.create_instance(node_tree)
     assert NodeWrapperMpfbAdditiveRange3.validate_tree_against_original_def()
     node_tree.nodes.remove(node)
-    NodeService.destroy_node_tree(node_tree)
@@ -24,10 +24,7 @@ def test_composite_can_create_instance():
     assert "toenailsgroup" in node_tree.nodes
     assert "fingernailsgroup" in node_tree.nodes
     assert "aureolaegroup" in node_tree.nodes
-    has_link_to_output = False
-    for link in node_tree.links:
-        if link.to_node.name == "Material Output":
-            has_link_to_output = True
+    has_link_to_output = any(socket.is_linked for socket in node_tree.nodes["Material Output"].inputs)
     assert has_link_to_output
     NodeService.destroy_node_tree(node_tree)
 